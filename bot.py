@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 import os
-import re
+import asyncio
 import logging
-import requests
-from datetime import datetime
+import httpx
+import numpy as np
+import orjson
+from cachetools import TTLCache
+from tenacity import retry, retry_if_result, stop_after_attempt, wait_exponential
+from datetime import datetime, timezone
+from functools import partial
 from urllib.parse import quote
 
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
 from telegram import Update, Chat
 from telegram.ext import (
     ApplicationBuilder,
@@ -40,10 +46,20 @@ logger = logging.getLogger(__name__)
 # ==========================================
 # 3. MongoDB Setup
 # ==========================================
-client = MongoClient(MONGODB_URI)
+client = MongoClient(
+    MONGODB_URI,
+    maxPoolSize=50,
+    minPoolSize=5,
+    compressors="zstd,zlib",  # zstd via the zstandard package, zlib as fallback
+    retryReads=True,
+    retryWrites=True,
+    serverSelectionTimeoutMS=3000,
+)
 db = client["snipe_checks"]
 picks_collection = db["picks"]     # For shilled CAs
 wallets_collection = db["wallets"] # For sniper bowl wallets
+prices_collection = db["prices"]   # Latest close price (SOL) per mint, _id = mint address
+leaderboards_collection = db["leaderboards"]  # Prebuilt top picks per chat, _id = chat_id
 
 # Ensure indexes
 picks_collection.create_index(
@@ -51,28 +67,154 @@ picks_collection.create_index(
     unique=True,
     name="chat_mint_unique_index"
 )
+wallets_collection.create_index(
+    [("chat_id", 1), ("wallet_address", 1)],
+    unique=True,
+    name="chat_wallet_unique_index"
+)
+picks_collection.create_index(
+    [("chat_id", 1), ("user_id", 1)],
+    name="chat_user_index"
+)
+
+# Competition rounds last 30 days: picks and wallets expire after that, and
+# derived documents expire once they stop being refreshed.
+ROUND_TTL_SECONDS = 30 * 86400
+picks_collection.create_index(
+    "created_at", expireAfterSeconds=ROUND_TTL_SECONDS, name="created_at_ttl_index"
+)
+wallets_collection.create_index(
+    "created_at", expireAfterSeconds=ROUND_TTL_SECONDS, name="created_at_ttl_index"
+)
+prices_collection.create_index(
+    "updated_at", expireAfterSeconds=86400, name="updated_at_ttl_index"
+)
+leaderboards_collection.create_index(
+    "updated_at", expireAfterSeconds=3600, name="updated_at_ttl_index"
+)
+
+async def find_all(collection, *args, **kwargs) -> list:
+    """find() in a worker thread, draining the cursor there so the event loop never blocks."""
+    return await asyncio.to_thread(lambda: list(collection.find(*args, **kwargs)))
+
+async def aggregate_all(collection, pipeline: list) -> list:
+    """aggregate() in a worker thread, draining the cursor there."""
+    return await asyncio.to_thread(lambda: list(collection.aggregate(pipeline)))
+
+class InsertBatcher:
+    """
+    Write-coalescing buffer. An insert with no write in flight goes out right
+    away; documents arriving while a write is running queue up and go out
+    next as one insert_many(ordered=False) of at most `max_batch` documents.
+    Each caller still gets its own outcome, e.g. DuplicateKeyError.
+    """
+
+    def __init__(self, collection, max_batch: int = 100):
+        self.collection = collection
+        self.max_batch = max_batch
+        self._pending = []      # (doc, Future)
+        self._writer = None     # task draining _pending, if a write is in flight
+
+    async def insert(self, doc: dict):
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((doc, fut))
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._drain())
+        return await fut
+
+    async def _drain(self):
+        try:
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                await self._write(batch)
+        finally:
+            self._writer = None
+
+    async def _write(self, batch: list):
+        errors = {}
+        try:
+            await asyncio.to_thread(
+                self.collection.insert_many, [doc for doc, _ in batch], ordered=False
+            )
+        except BulkWriteError as e:
+            # ordered=False: the rest of the batch was still written
+            errors = {err["index"]: err for err in e.details.get("writeErrors", [])}
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        for i, (_, fut) in enumerate(batch):
+            if fut.done():
+                continue
+            err = errors.get(i)
+            if err is None:
+                fut.set_result(None)
+            elif err.get("code") == 11000:
+                fut.set_exception(DuplicateKeyError(err.get("errmsg", ""), 11000, err))
+            else:
+                fut.set_exception(WriteError(err.get("errmsg", ""), err.get("code"), err))
+
+pick_inserts = InsertBatcher(picks_collection)
+wallet_inserts = InsertBatcher(wallets_collection)
+
+LEADERBOARD_REFRESH_INTERVAL = 30  # seconds between price/leaderboard refreshes
 
 # ==========================================
 # 4. Pump.fun API
 # ==========================================
-def get_sol_price() -> float:
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+RETRY_STATUSES = {429, 502, 503, 504}
+
+_http_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared async HTTP client, created lazily so keep-alive connections are reused."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(10.0),
+            transport=httpx.AsyncHTTPTransport(limits=HTTP_LIMITS, retries=3),
+        )
+    return _http_client
+
+async def close_http_client(application=None):
+    """post_shutdown hook: release pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+@retry(
+    retry=retry_if_result(lambda resp: resp.status_code in RETRY_STATUSES),
+    stop=stop_after_attempt(4),
+    wait=wait_exponential(multiplier=0.2),
+    retry_error_callback=lambda state: state.outcome.result(),
+)
+async def http_get(url: str, params: dict = None) -> httpx.Response:
+    """GET through the shared client, backing off on pump.fun 429s and gateway errors."""
+    return await get_http_client().get(url, params=params)
+
+async def get_sol_price() -> float:
     url = "https://frontend-api-v2.pump.fun/sol-price"
     try:
-        resp = requests.get(url, timeout=10)
+        resp = await http_get(url)
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
         return data.get("solPrice", 0.0)
     except Exception as e:
         logger.error(f"Error fetching SOL price: {e}")
         return 0.0
 
-def get_latest_close_price_in_sol(mint_address: str) -> float:
+async def get_latest_close_price_in_sol(mint_address: str) -> float:
     base_url = f"https://frontend-api-v2.pump.fun/candlesticks/{mint_address}"
     params = {"offset": "0", "limit": "1", "timeframe": "1"}
     try:
-        resp = requests.get(base_url, params=params, timeout=10)
+        resp = await http_get(base_url, params=params)
         resp.raise_for_status()
-        csticks = resp.json()
+        csticks = orjson.loads(resp.content)
         if not csticks:
             return 0.0
         latest_candle = csticks[-1]
@@ -81,19 +223,107 @@ def get_latest_close_price_in_sol(mint_address: str) -> float:
         logger.error(f"Error fetching candlestick for {mint_address}: {e}")
         return 0.0
 
+# Short-lived caches: every user in every chat sees the same prices within a
+# few seconds, so there is no need to hit pump.fun once per command.
+_sol_price_cache = TTLCache(maxsize=1, ttl=5)
+_close_price_cache = TTLCache(maxsize=10_000, ttl=30)
+
+# Fetches currently in flight, so concurrent cache misses share one request.
+_inflight = {}
+
+async def single_flight(key, fetch):
+    """Run fetch() once per key at a time; concurrent callers await the same task."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shield so one cancelled caller does not cancel the fetch for everyone else
+    return await asyncio.shield(task)
+
+async def get_sol_price_cached() -> float:
+    price = _sol_price_cache.get("sol")
+    if price is None:
+        price = await single_flight("sol", get_sol_price)
+        if price > 0:
+            _sol_price_cache["sol"] = price
+    return price
+
+async def get_latest_close_price_cached(mint_address: str) -> float:
+    price = _close_price_cache.get(mint_address)
+    if price is None:
+        price = await single_flight(
+            ("close", mint_address), partial(get_latest_close_price_in_sol, mint_address)
+        )
+        if price > 0:
+            _close_price_cache[mint_address] = price
+    return price
+
+class PriceLoader:
+    """
+    DataLoader-style batcher for candlestick closes. Mints requested within
+    `window` seconds are collected, de-duplicated and resolved as one batch,
+    with at most `max_concurrency` upstream fetches running at once.
+    """
+
+    def __init__(self, window: float = 0.05, max_concurrency: int = 16):
+        self.window = window
+        self._pending = {}      # mint_address -> Future
+        self._flush_task = None
+        # Stay well inside the HTTP pool so large batches queue here instead
+        # of failing with PoolTimeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def load(self, mint_address: str) -> float:
+        # Warm prices resolve immediately; only cache misses wait for the batch
+        cached = _close_price_cache.get(mint_address)
+        if cached is not None:
+            return cached
+        fut = self._pending.get(mint_address)
+        if fut is None:
+            fut = asyncio.get_running_loop().create_future()
+            self._pending[mint_address] = fut
+            if self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush())
+        return await asyncio.shield(fut)
+
+    async def load_many(self, mint_addresses) -> list:
+        return await asyncio.gather(*(self.load(m) for m in mint_addresses))
+
+    async def _flush(self):
+        await asyncio.sleep(self.window)
+        batch, self._pending, self._flush_task = self._pending, {}, None
+        closes = await self._fetch_batch(list(batch))
+        for fut, close in zip(batch.values(), closes):
+            if not fut.done():
+                fut.set_result(close)
+
+    async def _fetch_batch(self, mint_addresses: list) -> list:
+        # pump.fun has no multi-mint candlestick endpoint, so the batch fans
+        # out over the cached, single-flighted per-mint fetch.
+        return await asyncio.gather(*(self._fetch_one(m) for m in mint_addresses))
+
+    async def _fetch_one(self, mint_address: str) -> float:
+        async with self._slots:
+            return await get_latest_close_price_cached(mint_address)
+
+price_loader = PriceLoader()
+
+BASE58_ALPHABET = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
 def is_valid_solana_address(address: str) -> bool:
-    if len(address) not in [43, 44]:
+    if len(address) not in (43, 44):
         return False
-    pattern = r'^[1-9A-HJ-NP-Za-km-z]+$'
-    return bool(re.match(pattern, address))
+    # Delete every Base58 byte in one C-level pass; anything left over is invalid.
+    return not address.encode().translate(None, BASE58_ALPHABET)
 
-def get_wallet_balances(wallet_address: str, limit=50, offset=0) -> list:
+async def get_wallet_balances(wallet_address: str, limit=50, offset=0) -> list:
     url = f"https://frontend-api-v2.pump.fun/balances/{wallet_address}"
     params = {"limit": limit, "offset": offset, "minBalance": -1}
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = await http_get(url, params=params)
         resp.raise_for_status()
-        return resp.json()  # list of token objects
+        return orjson.loads(resp.content)  # list of token objects
     except Exception as e:
         logger.error(f"Error fetching balances for {wallet_address}: {e}")
         return []
@@ -102,6 +332,32 @@ def get_wallet_balances(wallet_address: str, limit=50, offset=0) -> list:
 # 5. Bot Handlers
 # ==========================================
 
+# ------------ OUTBOUND RATE LIMIT ------------
+class SendPacer:
+    """Leaky bucket: spaces outbound messages at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+
+    async def wait(self):
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+# Telegram caps a bot at ~30 messages/s overall; stay under it instead of
+# bursting into 429s that PTB then has to retry.
+OUTBOUND = asyncio.Semaphore(25)
+_outbound_pacer = SendPacer(rate=30)
+
+async def reply(update: Update, text: str, **kwargs):
+    """update.message.reply_text, throttled by the global outbound limits."""
+    async with OUTBOUND:
+        await _outbound_pacer.wait()
+        return await update.message.reply_text(text, **kwargs)
+
 # ------------ HELP & START ------------
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -115,7 +371,7 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Type /help for commands.\n"
         "Enjoy! 🚀"
     )
-    await update.message.reply_text(welcome_text, parse_mode="Markdown")
+    await reply(update, welcome_text, parse_mode="Markdown")
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
@@ -130,54 +386,146 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Just paste a *mint address* in chat to add a shilled CA. 🏹\n"
         "Or `/register_wallet` to track your *wallet* for the Sniper Bowl."
     )
-    await update.message.reply_text(help_text, parse_mode="Markdown")
+    await reply(update, help_text, parse_mode="Markdown")
 
 # ------------ FUNCTION 1: SHILLING CAs ------------
-async def leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    chat_id = update.effective_chat.id
-    sol_price = get_sol_price()
-    if sol_price <= 0:
-        await update.message.reply_text("❌ Could not fetch SOL price. Leaderboard unavailable.")
+# Chats that ran /leaderboard recently; only these get background refreshes.
+ACTIVE_CHAT_TTL = 600  # seconds
+_active_chats = TTLCache(maxsize=10_000, ttl=ACTIVE_CHAT_TTL)
+
+async def refresh_prices(chat_ids: list):
+    """
+    Store the latest close price (in SOL) of every mint picked in `chat_ids`
+    in the prices collection, which the leaderboard pipeline joins against.
+    """
+    mints = await asyncio.to_thread(
+        picks_collection.distinct, "mint_address", {"chat_id": {"$in": chat_ids}}
+    )
+    if not mints:
         return
 
-    all_picks = list(picks_collection.find({"chat_id": chat_id}))
-    if not all_picks:
-        await update.message.reply_text("No CA picks found. Paste a CA to add your first pick!")
+    closes = await price_loader.load_many(mints)
+
+    now = datetime.now(timezone.utc)
+    updates = [
+        UpdateOne({"_id": mint}, {"$set": {"close_sol": close_sol, "updated_at": now}}, upsert=True)
+        for mint, close_sol in zip(mints, closes)
+        if close_sol > 0  # keep the last known price rather than zeroing it
+    ]
+    if updates:
+        await asyncio.to_thread(prices_collection.bulk_write, updates, ordered=False)
+
+def top_picks_pipeline(chat_id: int, sol_price: float, limit: int = 10) -> list:
+    """Aggregation pipeline pricing a chat's picks from the prices collection, best PnL first."""
+    return [
+        {"$match": {"chat_id": chat_id}},
+        {"$project": {"_id": 0, "username": 1, "mint_address": 1, "cost_basis_usd": 1, "num_tokens": 1}},
+        {"$lookup": {
+            "from": prices_collection.name,
+            "localField": "mint_address",
+            "foreignField": "_id",
+            "as": "price",
+        }},
+        {"$addFields": {
+            "current_price_usd": {"$multiply": [
+                {"$ifNull": [{"$arrayElemAt": ["$price.close_sol", 0]}, 0.0]},
+                sol_price,
+            ]},
+        }},
+        {"$addFields": {
+            "pnl_usd": {"$subtract": [
+                {"$multiply": ["$num_tokens", "$current_price_usd"]},
+                "$cost_basis_usd",
+            ]},
+        }},
+        {"$sort": {"pnl_usd": -1}},
+        {"$limit": limit},
+        {"$unset": "price"},
+    ]
+
+async def refresh_leaderboards(context: ContextTypes.DEFAULT_TYPE):
+    """
+    Repeating job: for chats that used /leaderboard recently, refresh prices
+    and prebuild the top 10 into the leaderboards collection so /leaderboard
+    is a single find_one. Idle chats cost no upstream requests.
+    """
+    started = datetime.now(timezone.utc)
+    chat_ids = list(_active_chats)
+    # Drop boards nobody is refreshing any more (idle chats, or chats whose
+    # picks have all expired); their next /leaderboard rebuilds inline
+    await asyncio.to_thread(leaderboards_collection.delete_many, {"_id": {"$nin": chat_ids}})
+    if not chat_ids:
         return
 
-    data_list = []
-    for pick in all_picks:
-        mint = pick["mint_address"]
-        cost_basis_usd = pick["cost_basis_usd"]
-        num_tokens = pick["num_tokens"]
-        username = pick["username"]
+    await refresh_prices(chat_ids)
 
-        current_close_sol = get_latest_close_price_in_sol(mint)
-        current_token_price_usd = current_close_sol * sol_price
-        current_value_usd = num_tokens * current_token_price_usd
-        pnl = current_value_usd - cost_basis_usd
+    sol_price = await get_sol_price_cached()
+    if sol_price <= 0:
+        logger.warning("Skipping leaderboard refresh: SOL price unavailable.")
+        return
 
-        data_list.append({
-            "username": username,
-            "mint": mint,
-            "cost_basis_usd": cost_basis_usd,
-            "current_price_usd": current_token_price_usd,
-            "pnl": pnl
-        })
+    boards = await asyncio.gather(
+        *(aggregate_all(picks_collection, top_picks_pipeline(c, sol_price)) for c in chat_ids)
+    )
 
-    data_list.sort(key=lambda x: x["pnl"], reverse=True)
-    result_text = "🏆 *Shilled CA Leaderboard:* 🏆\n\n"
-    for rank, item in enumerate(data_list[:10], start=1):
-        sign = "+" if item["pnl"] >= 0 else "-"
-        abs_pnl = abs(item["pnl"])
-        result_text += (
-            f"{rank}. {item['username']} (Mint: `{item['mint']}`)\n"
+    # Don't overwrite a board invalidated by a pick added after this run
+    # started; the upsert then hits the existing _id and fails harmlessly.
+    not_invalidated_since = {"$or": [
+        {"invalidated_at": {"$exists": False}},
+        {"invalidated_at": {"$lt": started}},
+    ]}
+    now = datetime.now(timezone.utc)
+    updates = [
+        ReplaceOne(
+            {"_id": chat_id, **not_invalidated_since},
+            {"top_picks": top_picks, "updated_at": now},
+            upsert=True,
+        )
+        for chat_id, top_picks in zip(chat_ids, boards)
+    ]
+    if updates:
+        try:
+            await asyncio.to_thread(leaderboards_collection.bulk_write, updates, ordered=False)
+        except BulkWriteError as e:
+            errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+            if errors:
+                logger.error(f"Error writing leaderboards: {errors}")
+
+async def leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    chat_id = update.effective_chat.id
+    _active_chats[chat_id] = True
+
+    board = await asyncio.to_thread(leaderboards_collection.find_one, {"_id": chat_id})
+    if board is not None and "top_picks" in board:
+        top_picks = board["top_picks"]
+    else:
+        # Not prebuilt yet, or invalidated by a new pick since the last refresh.
+        # Prices are only kept fresh for active chats, so refresh this chat's first.
+        sol_price = await get_sol_price_cached()
+        if sol_price <= 0:
+            await reply(update, "❌ Could not fetch SOL price. Leaderboard unavailable.")
+            return
+        await refresh_prices([chat_id])
+        top_picks = await aggregate_all(picks_collection, top_picks_pipeline(chat_id, sol_price))
+
+    if not top_picks:
+        await reply(update, "No CA picks found. Paste a CA to add your first pick!")
+        return
+
+    parts = ["🏆 *Shilled CA Leaderboard:* 🏆\n\n"]
+    for rank, pick in enumerate(top_picks, start=1):
+        pnl = pick["pnl_usd"]
+        sign = "+" if pnl >= 0 else "-"
+        abs_pnl = abs(pnl)
+        parts.append(
+            f"{rank}. {pick['username']} (Mint: `{pick['mint_address']}`)\n"
             f"   PnL: {sign}${abs_pnl:,.2f}\n"
-            f"   Entry(0.5 SOL in USD): ${item['cost_basis_usd']:.2f}\n"
-            f"   Current Token Price: ${item['current_price_usd']:.8f}\n\n"
+            f"   Entry(0.5 SOL in USD): ${pick['cost_basis_usd']:.2f}\n"
+            f"   Current Token Price: ${pick['current_price_usd']:.8f}\n\n"
         )
 
-    await update.message.reply_text(result_text, parse_mode="Markdown")
+    result_text = "".join(parts)
+    await reply(update, result_text, parse_mode="Markdown")
 
 # ------------ FUNCTION 2: SNIPER BOWL ------------
 async def register_wallet_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -186,22 +534,28 @@ async def register_wallet_command(update: Update, context: ContextTypes.DEFAULT_
     username = update.effective_user.username or "Anonymous"
 
     if len(context.args) == 0:
-        await update.message.reply_text("Usage: /register_wallet <solana_wallet_address>")
+        await reply(update, "Usage: /register_wallet <solana_wallet_address>")
         return
 
     wallet_address = context.args[0].strip()
     if not is_valid_solana_address(wallet_address):
-        await update.message.reply_text("❌ Invalid Solana address. Please try again.")
+        await reply(update, "❌ Invalid Solana address. Please try again.")
         return
 
-    existing = wallets_collection.find_one({"chat_id": chat_id, "wallet_address": wallet_address})
+    # Cheap pre-check so re-registering gets the right answer even when the
+    # price fetch below fails; the unique index still settles races
+    existing = await asyncio.to_thread(
+        wallets_collection.find_one,
+        {"chat_id": chat_id, "wallet_address": wallet_address},
+        {"_id": 1},
+    )
     if existing:
-        await update.message.reply_text("⚠️ This wallet is already registered in this chat.")
+        await reply(update, "⚠️ This wallet is already registered in this chat.")
         return
 
-    sol_price = get_sol_price()
+    sol_price = await get_sol_price_cached()
     if sol_price <= 0:
-        await update.message.reply_text("❌ Could not fetch SOL price. Try again later.")
+        await reply(update, "❌ Could not fetch SOL price. Try again later.")
         return
 
     start_usd_value = 0.5 * sol_price
@@ -212,13 +566,17 @@ async def register_wallet_command(update: Update, context: ContextTypes.DEFAULT_
         "username": username,
         "wallet_address": wallet_address,
         "start_usd_value": start_usd_value,
-        "created_at": datetime.utcnow()
+        "created_at": datetime.now(timezone.utc)
     }
     try:
-        wallets_collection.insert_one(doc)
+        await wallet_inserts.insert(doc)
+    except DuplicateKeyError:
+        # chat_wallet_unique_index: concurrent registrations cannot both succeed
+        await reply(update, "⚠️ This wallet is already registered in this chat.")
+        return
     except Exception as e:
         logger.error(f"Error registering wallet: {e}")
-        await update.message.reply_text("❌ Could not register wallet. Possibly a duplicate or DB error.")
+        await reply(update, "❌ Could not register wallet. Possibly a duplicate or DB error.")
         return
 
     msg = (
@@ -227,34 +585,43 @@ async def register_wallet_command(update: Update, context: ContextTypes.DEFAULT_
         f"Starting assumption: 0.5 SOL (~${start_usd_value:.2f}).\n"
         f"Use /sniper_leaderboard to see who’s winning!"
     )
-    await update.message.reply_text(msg, parse_mode="Markdown")
+    await reply(update, msg, parse_mode="Markdown")
 
 
+def portfolio_value_usd(balances: list) -> float:
+    """Sum of balance * value over a wallet's tokens, as one vectorized dot product."""
+    n = len(balances)
+    token_balances = np.fromiter((t.get("balance") or 0 for t in balances), dtype=np.float64, count=n)
+    token_prices = np.fromiter((t.get("value") or 0 for t in balances), dtype=np.float64, count=n)
+    return float(token_balances @ token_prices)
+
 async def sniper_leaderboard_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
-    sol_price = get_sol_price()
+    sol_price = await get_sol_price_cached()
     if sol_price <= 0:
-        await update.message.reply_text("❌ Could not fetch SOL price. Leaderboard unavailable.")
+        await reply(update, "❌ Could not fetch SOL price. Leaderboard unavailable.")
         return
 
-    all_wallets = list(wallets_collection.find({"chat_id": chat_id}))
+    all_wallets = await find_all(
+        wallets_collection,
+        {"chat_id": chat_id},
+        {"_id": 0, "username": 1, "wallet_address": 1, "start_usd_value": 1},
+    )
     if not all_wallets:
-        await update.message.reply_text("No wallets here. Use /register_wallet <address> to join!")
+        await reply(update, "No wallets here. Use /register_wallet <address> to join!")
         return
 
+    all_balances = await asyncio.gather(
+        *(get_wallet_balances(w["wallet_address"]) for w in all_wallets)
+    )
+
     results = []
-    for w in all_wallets:
+    for w, balances in zip(all_wallets, all_balances):
         user_name = w["username"]
         wallet_address = w["wallet_address"]
         start_usd_value = w["start_usd_value"]
 
-        balances = get_wallet_balances(wallet_address)
-
-        total_usd = 0.0
-        for token_info in balances:
-            token_price = token_info.get("value", 0)
-            token_balance = token_info.get("balance", 0)
-            total_usd += token_balance * token_price
+        total_usd = portfolio_value_usd(balances)
 
         pnl_usd = total_usd - start_usd_value
 
@@ -267,43 +634,56 @@ async def sniper_leaderboard_command(update: Update, context: ContextTypes.DEFAU
 
     results.sort(key=lambda x: x["pnl_usd"], reverse=True)
 
-    result_text = "🏆 *Sniper Bowl Leaderboard:* 🏆\n\n"
+    parts = ["🏆 *Sniper Bowl Leaderboard:* 🏆\n\n"]
     for rank, item in enumerate(results[:10], start=1):
         sign = "+" if item["pnl_usd"] >= 0 else "-"
         abs_pnl = abs(item["pnl_usd"])
-        result_text += (
+        parts.append(
             f"{rank}. {item['username']} (Wallet: `{item['wallet_address']}`)\n"
             f"   Net Worth: ${item['net_worth_usd']:.2f}\n"
             f"   PnL: {sign}${abs_pnl:,.2f}\n\n"
         )
 
-    await update.message.reply_text(result_text, parse_mode="Markdown")
+    result_text = "".join(parts)
+    await reply(update, result_text, parse_mode="Markdown")
 
 # ------------ /share ------------
+TWEET_URL_PREFIX = "https://twitter.com/intent/tweet?text="
+TWEET_SUFFIX_ENCODED = quote("\nShared via #SnipeChecksBot")
+
 async def share_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     user_id = update.effective_user.id
     username = update.effective_user.username or "Anonymous"
 
-    user_picks = list(picks_collection.find({"chat_id": chat_id, "user_id": user_id}))
+    user_picks = await find_all(
+        picks_collection,
+        {"chat_id": chat_id, "user_id": user_id},
+        {"_id": 0, "mint_address": 1, "cost_basis_usd": 1, "num_tokens": 1},
+    )
     if not user_picks:
-        await update.message.reply_text("No CA picks found for you here. Paste a CA first!")
+        await reply(update, "No CA picks found for you here. Paste a CA first!")
         return
 
-    sol_price = get_sol_price()
+    sol_price = await get_sol_price_cached()
     if sol_price <= 0:
-        await update.message.reply_text("Error fetching SOL price. Try again later.")
+        await reply(update, "Error fetching SOL price. Try again later.")
         return
 
-    lines = []
+    # One lookup per distinct mint, however many picks reference it
+    unique_mints = list(dict.fromkeys(pick["mint_address"] for pick in user_picks))
+    closes = await price_loader.load_many(unique_mints)
+    close_by_mint = dict(zip(unique_mints, closes))
+
+    lines = [f"{username}'s Picks (Chat {chat_id}):", ""]
     total_pnl = 0.0
 
     for pick in user_picks:
         mint = pick["mint_address"]
         cost_basis_usd = pick["cost_basis_usd"]
         num_tokens = pick["num_tokens"]
+        current_close_sol = close_by_mint[mint]
 
-        current_close_sol = get_latest_close_price_in_sol(mint)
         current_price_usd = current_close_sol * sol_price
         current_value_usd = num_tokens * current_price_usd
         pnl = current_value_usd - cost_basis_usd
@@ -316,20 +696,15 @@ async def share_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     sign_total = "+" if total_pnl >= 0 else "-"
     abs_total = abs(total_pnl)
 
-    tweet_text = (
-        f"{username}'s Picks (Chat {chat_id}):\n\n"
-        + "\n".join(lines)
-        + f"\n\nTotal PnL: {sign_total}${abs_total:,.2f}\n"
-        "Shared via #SnipeChecksBot"
-    )
-    encoded_tweet = quote(tweet_text)
-    twitter_link = f"https://twitter.com/intent/tweet?text={encoded_tweet}"
+    lines += ["", f"Total PnL: {sign_total}${abs_total:,.2f}"]
+    # quote() encodes character by character, so the constant tail can be encoded once
+    twitter_link = TWEET_URL_PREFIX + quote("\n".join(lines)) + TWEET_SUFFIX_ENCODED
 
     msg = (
         f"🔗 Share your picks on Twitter:\n\n"
         f"[Click Here to Tweet]({twitter_link})"
     )
-    await update.message.reply_text(msg, parse_mode="Markdown", disable_web_page_preview=True)
+    await reply(update, msg, parse_mode="Markdown", disable_web_page_preview=True)
 
 # ------------ Catch CA or fallback ------------
 async def handle_contract_address(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -343,19 +718,16 @@ async def handle_contract_address(update: Update, context: ContextTypes.DEFAULT_
     username = update.effective_user.username or "Anonymous"
     mint_address = text
 
-    existing_pick = picks_collection.find_one({"chat_id": chat_id, "mint_address": mint_address})
-    if existing_pick:
-        await update.message.reply_text(f"⚠️ This CA was already shilled here: {mint_address}")
-        return
-
-    sol_price = get_sol_price()
+    # Independent lookups: fetch both prices concurrently
+    sol_price, close_price_sol = await asyncio.gather(
+        get_sol_price_cached(), price_loader.load(mint_address)
+    )
     if sol_price <= 0:
-        await update.message.reply_text("Error: Could not fetch SOL price. Try again later.")
+        await reply(update, "Error: Could not fetch SOL price. Try again later.")
         return
 
-    close_price_sol = get_latest_close_price_in_sol(mint_address)
     if close_price_sol <= 0:
-        await update.message.reply_text(f"Error: Invalid close price for CA: {mint_address}")
+        await reply(update, f"Error: Invalid close price for CA: {mint_address}")
         return
 
     cost_basis_usd = 0.5 * sol_price
@@ -368,15 +740,34 @@ async def handle_contract_address(update: Update, context: ContextTypes.DEFAULT_
         "mint_address": mint_address,
         "cost_basis_usd": cost_basis_usd,
         "num_tokens": num_tokens,
-        "created_at": datetime.utcnow()
+        "created_at": datetime.now(timezone.utc)
     }
     try:
-        picks_collection.insert_one(pick_doc)
+        await pick_inserts.insert(pick_doc)
+    except DuplicateKeyError:
+        # chat_mint_unique_index: no separate lookup needed before inserting
+        await reply(update, f"⚠️ This CA was already shilled here: {mint_address}")
+        return
     except Exception as e:
         logger.error(f"Error inserting pick: {e}")
-        await update.message.reply_text("❌ Could not add your pick. Possibly a duplicate or DB error.")
+        await reply(update, "❌ Could not add your pick. Possibly a duplicate or DB error.")
         return
 
+    # Seed the price and invalidate the chat's prebuilt board, so the next
+    # /leaderboard runs the pipeline inline and already includes this pick
+    await asyncio.to_thread(
+        prices_collection.update_one,
+        {"_id": mint_address},
+        {"$set": {"close_sol": close_price_sol, "updated_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+    await asyncio.to_thread(
+        leaderboards_collection.update_one,
+        {"_id": chat_id},
+        {"$set": {"invalidated_at": datetime.now(timezone.utc)}, "$unset": {"top_picks": ""}},
+        upsert=True,
+    )
+
     reply_text = (
         f"✅ Added your pick for CA: {mint_address}\n"
         f"Invested: 0.5 SOL (~${cost_basis_usd:.2f})\n"
@@ -384,17 +775,23 @@ async def handle_contract_address(update: Update, context: ContextTypes.DEFAULT_
         f"Use /leaderboard to see rankings!\n"
         f"Use /share to post on Twitter."
     )
-    await update.message.reply_text(reply_text)
+    await reply(update, reply_text)
 
 async def fallback_echo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Fallback echo if text is not recognized as CA/command."""
-    await update.message.reply_text(f"You said: {update.message.text}")
+    await reply(update, f"You said: {update.message.text}")
 
 # ==========================================
 # 6. Main
 # ==========================================
 def main():
-    app = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).build()
+    app = (
+        ApplicationBuilder()
+        .token(TELEGRAM_BOT_TOKEN)
+        .concurrent_updates(True)
+        .post_shutdown(close_http_client)
+        .build()
+    )
 
     # Commands
     app.add_handler(CommandHandler("start", start_command))
@@ -404,6 +801,11 @@ def main():
     app.add_handler(CommandHandler("sniper_leaderboard", sniper_leaderboard_command))
     app.add_handler(CommandHandler("share", share_command))
 
+    # Prebuild /leaderboard results off the request path
+    app.job_queue.run_repeating(
+        refresh_leaderboards, interval=LEADERBOARD_REFRESH_INTERVAL, first=0
+    )
+
     # Handle text -> either valid CA or fallback
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_contract_address))
 
@@ -0,0 +1,13 @@
+import os
+import sys
+from unittest import mock
+
+import mongomock
+
+# bot.py reads its settings and connects to MongoDB at import time
+os.environ["TELEGRAM_BOT_TOKEN"] = "123456:test-token"
+os.environ["MONGODB_URI"] = "mongodb://localhost:27017"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+with mock.patch("pymongo.MongoClient", lambda *args, **kwargs: mongomock.MongoClient()):
+    import bot  # noqa: E402,F401
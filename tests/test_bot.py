@@ -0,0 +1,122 @@
+import asyncio
+from unittest import mock
+
+import httpx
+import mongomock
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+import bot
+
+
+@pytest.fixture
+def pump_fun(monkeypatch):
+    """Route the shared HTTP client to a handler and start with empty price caches."""
+    bot._sol_price_cache.clear()
+    bot._close_price_cache.clear()
+
+    def install(handler):
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(bot, "_http_client", client)
+
+    return install
+
+
+def test_single_flight_shares_one_fetch_across_429_retry(pump_fun):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(429)
+        return httpx.Response(200, json={"solPrice": 150.0})
+
+    pump_fun(handler)
+
+    async def run():
+        return await asyncio.gather(*(bot.get_sol_price_cached() for _ in range(5)))
+
+    assert asyncio.run(run()) == [150.0] * 5
+    # One 429 plus one successful retry, shared by all five callers
+    assert calls == ["/sol-price", "/sol-price"]
+    assert bot._inflight == {}
+
+
+def test_price_loader_cache_hit_skips_batch_window(pump_fun):
+    pump_fun(lambda request: pytest.fail(f"unexpected request to {request.url}"))
+    bot._close_price_cache["cachedMint"] = 1.5
+    loader = bot.PriceLoader(window=10)
+
+    async def run():
+        # Far shorter than the window: a hit must not wait for a flush
+        return await asyncio.wait_for(loader.load("cachedMint"), timeout=0.5)
+
+    assert asyncio.run(run()) == 1.5
+    assert loader._flush_task is None
+
+
+def test_price_loader_dedupes_misses_in_one_batch(pump_fun):
+    calls = []
+
+    def handler(request):
+        mint = request.url.path.rsplit("/", 1)[-1]
+        calls.append(mint)
+        return httpx.Response(200, json=[{"close": float(len(mint))}])
+
+    pump_fun(handler)
+    loader = bot.PriceLoader(window=0.01)
+
+    async def run():
+        return await loader.load_many(["a", "bb", "a"])
+
+    assert asyncio.run(run()) == [1.0, 2.0, 1.0]
+    assert sorted(calls) == ["a", "bb"]
+
+
+@pytest.fixture
+def unique_collection():
+    collection = mongomock.MongoClient().db.items
+    collection.create_index("k", unique=True)
+    return collection
+
+
+def test_insert_batcher_maps_duplicate_in_batch_to_its_caller(unique_collection):
+    batcher = bot.InsertBatcher(unique_collection)
+
+    async def run():
+        return await asyncio.gather(
+            *(batcher.insert({"k": k}) for k in [1, 2, 1, 3]), return_exceptions=True
+        )
+
+    with mock.patch.object(unique_collection, "insert_many", wraps=unique_collection.insert_many) as spy:
+        results = asyncio.run(run())
+
+    assert spy.call_count == 1
+    assert results[0] is None and results[1] is None and results[3] is None
+    assert isinstance(results[2], DuplicateKeyError)
+    # ordered=False: documents after the duplicate were still written
+    assert sorted(d["k"] for d in unique_collection.find()) == [1, 2, 3]
+
+
+def test_insert_batcher_splits_bursts_at_max_batch(unique_collection):
+    batcher = bot.InsertBatcher(unique_collection, max_batch=2)
+
+    async def run():
+        await asyncio.gather(*(batcher.insert({"k": k}) for k in range(5)))
+
+    with mock.patch.object(unique_collection, "insert_many", wraps=unique_collection.insert_many) as spy:
+        asyncio.run(run())
+
+    assert [len(call.args[0]) for call in spy.call_args_list] == [2, 2, 1]
+    assert unique_collection.count_documents({}) == 5
+    assert batcher._writer is None
+
+
+def test_insert_batcher_writes_lone_insert_without_waiting(unique_collection):
+    batcher = bot.InsertBatcher(unique_collection)
+
+    async def run():
+        await asyncio.wait_for(batcher.insert({"k": 1}), timeout=0.05)
+
+    asyncio.run(run())
+    assert unique_collection.count_documents({"k": 1}) == 1